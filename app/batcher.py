@@ -0,0 +1,105 @@
+import asyncio
+import os
+from collections import defaultdict
+from concurrent.futures import Executor
+from typing import Any, Dict, List, Optional, Set
+
+from .qiskit_runner import run_batch
+
+
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "10"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "64"))
+
+
+class CircuitBatcher:
+    """
+    Coalesces circuits submitted within a short time window into one
+    backend.run() call per (backend, shots, memory) group. Batches run on
+    `executor` (the loop's default thread pool when None), up to
+    `max_in_flight` at a time (unbounded when None) so a slow batch does not
+    hold up the ones behind it.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        window_ms: float = BATCH_WINDOW_MS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_in_flight: Optional[int] = None,
+    ):
+        self._executor = executor
+        self._window = window_ms / 1000.0
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_in_flight = max_in_flight
+        self._lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, backend_name: str, circuit_key: Any, shots: int, memory: bool) -> Dict:
+        await self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((backend_name, circuit_key, shots, memory, future))
+        return await future
+
+    async def _ensure_worker(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            # Start (or restart) the drain task on the loop serving this request
+            if self._loop is not loop or self._worker is None or self._worker.done():
+                self._loop = loop
+                self._queue = asyncio.Queue()
+                if self._max_in_flight is not None:
+                    self._slots = asyncio.Semaphore(max(1, self._max_in_flight))
+                self._worker = loop.create_task(self._drain())
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self._window)
+            while len(batch) < self._max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            groups: Dict[tuple, List[tuple]] = defaultdict(list)
+            for job in batch:
+                backend_name, _, shots, memory, _ = job
+                groups[(backend_name, shots, memory)].append(job)
+
+            # Each group runs as its own task; draining resumes as soon as a
+            # slot is free instead of waiting for the group to finish
+            slots = self._slots
+            for (backend_name, shots, memory), jobs in groups.items():
+                if slots is not None:
+                    await slots.acquire()
+                task = loop.create_task(self._run_group(backend_name, shots, memory, jobs, slots))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _run_group(
+        self, backend_name: str, shots: int, memory: bool, jobs: List[tuple], slots: Optional[asyncio.Semaphore]
+    ):
+        loop = asyncio.get_running_loop()
+        circuit_keys = [job[1] for job in jobs]
+        try:
+            results = await loop.run_in_executor(
+                self._executor, run_batch, backend_name, circuit_keys, shots, memory
+            )
+        except Exception as e:
+            for job in jobs:
+                if not job[4].done():
+                    job[4].set_exception(e)
+            return
+        finally:
+            if slots is not None:
+                slots.release()
+
+        for job, result in zip(jobs, results):
+            if job[4].done():
+                continue
+            if isinstance(result, Exception):
+                job[4].set_exception(result)
+            else:
+                job[4].set_result(result)
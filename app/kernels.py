@@ -0,0 +1,118 @@
+"""
+In-place statevector kernels for the evolution fast path.
+Amplitude index bit k is qubit k, matching Qiskit's little-endian ordering.
+"""
+import ctypes
+import os
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # optional dependency; callers check NUMBA_AVAILABLE
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+@njit(cache=True)
+def apply_1q(state, mat, target, cmask):
+    """
+    Applies the 2x2 matrix `mat` to qubit `target` on every basis state whose
+    control bits (`cmask`) are all set. cmask=0 applies it unconditionally.
+    """
+    m = 1 << target
+    low = m - 1
+    m00, m01, m10, m11 = mat[0, 0], mat[0, 1], mat[1, 0], mat[1, 1]
+    for k in range(state.shape[0] >> 1):
+        # Insert a 0 at bit `target` to enumerate each amplitude pair once
+        i = ((k & ~low) << 1) | (k & low)
+        if (i & cmask) != cmask:
+            continue
+        j = i | m
+        a0 = state[i]
+        a1 = state[j]
+        state[i] = m00 * a0 + m01 * a1
+        state[j] = m10 * a0 + m11 * a1
+
+
+@njit(cache=True)
+def apply_2q(state, mat, q0, q1):
+    """
+    Applies the 4x4 matrix `mat` to qubits (q0, q1). Matrix rows/columns are
+    indexed by bit(q0) + 2 * bit(q1), as in Qiskit.
+    """
+    lo = min(q0, q1)
+    hi = max(q0, q1)
+    lo_mask = (1 << lo) - 1
+    hi_mask = (1 << hi) - 1
+    b0 = 1 << q0
+    b1 = 1 << q1
+    amps = np.empty(4, dtype=state.dtype)
+    for k in range(state.shape[0] >> 2):
+        # Insert 0s at bits lo and then hi to enumerate each 4-amplitude group once
+        i = ((k & ~lo_mask) << 1) | (k & lo_mask)
+        i = ((i & ~hi_mask) << 1) | (i & hi_mask)
+        idx = (i, i | b0, i | b1, i | b0 | b1)
+        for r in range(4):
+            amps[r] = state[idx[r]]
+        for r in range(4):
+            acc = 0j
+            for c in range(4):
+                acc += mat[r, c] * amps[c]
+            state[idx[r]] = acc
+
+
+def _load_svkernel():
+    # Compiled from app/svkernel.c; build instructions are in README.md
+    path = os.getenv("SVKERNEL_PATH") or os.path.join(os.path.dirname(__file__), "_svkernel.so")
+    try:
+        lib = ctypes.CDLL(path)
+    except OSError:
+        return None
+
+    vec = np.ctypeslib.ndpointer(dtype=np.float64, flags="C_CONTIGUOUS")
+    lib.apply_1q.argtypes = [vec, vec, vec, vec, ctypes.c_int, ctypes.c_uint64, ctypes.c_size_t]
+    lib.apply_1q.restype = None
+    lib.apply_2q.argtypes = [vec, vec, vec, vec, ctypes.c_int, ctypes.c_int, ctypes.c_size_t]
+    lib.apply_2q.restype = None
+    return lib
+
+
+_SVKERNEL = _load_svkernel()
+SVKERNEL_AVAILABLE = _SVKERNEL is not None
+
+
+def svkernel_init(num_qubits: int):
+    """Returns the split (re, im) state |0...0> used by the C kernels."""
+    re = np.zeros(2 ** num_qubits)
+    re[0] = 1.0
+    return re, np.zeros(2 ** num_qubits)
+
+
+def svkernel_snapshot(state) -> np.ndarray:
+    re, im = state
+    out = np.empty(re.shape[0], dtype=np.complex128)
+    out.real = re
+    out.imag = im
+    return out
+
+
+def svkernel_apply_1q(state, mat, target, cmask):
+    re, im = state
+    _SVKERNEL.apply_1q(
+        re, im, np.ascontiguousarray(mat.real).ravel(), np.ascontiguousarray(mat.imag).ravel(),
+        target, cmask, re.shape[0],
+    )
+
+
+def svkernel_apply_2q(state, mat, q0, q1):
+    re, im = state
+    _SVKERNEL.apply_2q(
+        re, im, np.ascontiguousarray(mat.real).ravel(), np.ascontiguousarray(mat.imag).ravel(),
+        q0, q1, re.shape[0],
+    )
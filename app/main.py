@@ -1,89 +1,157 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
-import os
-from typing import List
-from pydantic import BaseModel
-
-from .models import ExecuteRequest, ExecuteResponse
-from .qiskit_runner import run_circuit, get_state_evolution
-
-
-load_dotenv()
-
-ALLOWED_ORIGINS = [o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",")]
-HOST = os.getenv("HOST", "0.0.0.0")
-PORT = int(os.getenv("PORT", "8000"))
-
-# --- New Model for Task (f) ---
-class EvolutionResponse(BaseModel):
-    status: str = "success"
-    intermediateStates: List[List[str]]
-
-
-app = FastAPI(title="QuantumFlow Backend", version="1.0.0")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=ALLOWED_ORIGINS if ALLOWED_ORIGINS != ["*"] else ["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.get("/health")
-def health():
-    # Check Qiskit availability and env config
-    qiskit_ok = True
-    try:
-        import qiskit  # noqa: F401
-    except Exception:
-        qiskit_ok = False
-    return {
-        "status": "ok",
-        "qiskit": qiskit_ok,
-        "backend_env": os.getenv("QISKIT_BACKEND", "aer_simulator"),
-    }
-
-
-@app.post("/api/v1/execute", response_model=ExecuteResponse)
-def execute(req: ExecuteRequest) -> ExecuteResponse:
-    try:
-        result = run_circuit(
-            num_qubits=req.num_qubits,
-            gates=[g.model_dump() for g in req.gates],
-            shots=req.shots,
-            memory=req.memory,
-            override_backend=req.backend,
-        )
-        return ExecuteResponse(**result, status="success")
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
-
-@app.post("/api/v1/execute-evolution", response_model=EvolutionResponse)
-def execute_evolution(req: ExecuteRequest) -> EvolutionResponse:
-    """
-    New endpoint for hackathon Task (f).
-    Calculates intermediate statevectors.
-    """
-    try:
-        # Call the new function from qiskit_runner.py
-        result = get_state_evolution(
-            num_qubits=req.num_qubits,
-            gates=[g.model_dump() for g in req.gates],
-        )
-        
-        # The result is {"intermediateStates": [...]}.
-        # We add the "status" field to match our EvolutionResponse model.
-        return EvolutionResponse(status="success", **result)
-    
-    except Exception as e:
-        # Re-use the existing error handling
-        raise HTTPException(status_code=400, detail=str(e))
-
-
-if __name__ == "__main__":
-    import uvicorn
-    # This line MUST be indented
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from dotenv import load_dotenv
+import orjson
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List
+from pydantic import BaseModel
+
+from .models import ExecuteRequest, ExecuteResponse
+from .qiskit_runner import (
+    prepare_circuit, probabilities_from_counts, get_state_evolution, get_state_evolution_binary, warm_up_worker,
+)
+from .batcher import CircuitBatcher
+from .streaming import EvolutionStreamer
+
+
+load_dotenv()
+
+ALLOWED_ORIGINS = [o.strip() for o in os.getenv("ALLOWED_ORIGINS", "*").split(",")]
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+EXECUTOR_WORKERS = int(os.getenv("EXECUTOR_WORKERS", "0")) or os.cpu_count() or 1
+
+# --- New Model for Task (f) ---
+class EvolutionResponse(BaseModel):
+    status: str = "success"
+    intermediateStates: List[List[str]]
+
+
+# Transpilation and simulation hold the GIL, so they run in worker processes.
+# Workers receive plain gate data (circuit keys / gate models), never circuits.
+# The initializer lives in qiskit_runner so workers never import this module.
+EXECUTOR = ProcessPoolExecutor(
+    max_workers=EXECUTOR_WORKERS,
+    mp_context=multiprocessing.get_context("spawn"),
+    initializer=warm_up_worker,
+)
+
+
+def _json_response(content: dict) -> Response:
+    # Serialize with orjson directly. Returning a Response also skips FastAPI's
+    # re-validation and jsonable_encoder pass over large counts/statevector payloads.
+    return Response(content=orjson.dumps(content), media_type="application/json")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    streamer.shutdown()
+    EXECUTOR.shutdown(cancel_futures=True)
+
+
+app = FastAPI(title="QuantumFlow Backend", version="1.0.0", lifespan=lifespan)
+batcher = CircuitBatcher(EXECUTOR, max_in_flight=EXECUTOR_WORKERS)
+streamer = EvolutionStreamer(EXECUTOR)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=ALLOWED_ORIGINS if ALLOWED_ORIGINS != ["*"] else ["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+@app.get("/health")
+def health():
+    # Check Qiskit availability and env config
+    qiskit_ok = True
+    try:
+        import qiskit  # noqa: F401
+    except Exception:
+        qiskit_ok = False
+    return {
+        "status": "ok",
+        "qiskit": qiskit_ok,
+        "backend_env": os.getenv("QISKIT_BACKEND", "aer_simulator"),
+    }
+
+
+@app.post("/api/v1/execute", response_model=ExecuteResponse)
+async def execute(req: ExecuteRequest) -> Response:
+    try:
+        backend_name, circuit_key = prepare_circuit(
+            num_qubits=req.num_qubits,
+            gates=req.gates,
+            override_backend=req.backend,
+        )
+        # Concurrent requests are coalesced into one backend.run() call
+        result = await batcher.submit(backend_name, circuit_key, req.shots, req.memory)
+        if req.return_probabilities:
+            result["probabilities"] = probabilities_from_counts(result["counts"], req.shots)
+        return _json_response({**result, "status": "success"})
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/v1/execute-evolution", response_model=EvolutionResponse)
+async def execute_evolution(req: ExecuteRequest) -> Response:
+    """
+    New endpoint for hackathon Task (f).
+    Calculates intermediate statevectors.
+    """
+    try:
+        # Call the new function from qiskit_runner.py in a worker process
+        result = await asyncio.get_running_loop().run_in_executor(
+            EXECUTOR, get_state_evolution, req.num_qubits, req.gates
+        )
+        
+        # The result is {"intermediateStates": [...]}.
+        # We add the "status" field to match our EvolutionResponse model.
+        return _json_response({"status": "success", **result})
+    
+    except Exception as e:
+        # Re-use the existing error handling
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/v1/execute-evolution-stream")
+async def execute_evolution_stream(req: ExecuteRequest) -> StreamingResponse:
+    """
+    Streaming variant of /execute-evolution. Sends one NDJSON line
+    {"col": i, "state": [...]} per snapshot (col 0 is the initial state)
+    as soon as it has been computed.
+    """
+    try:
+        lines = await streamer.open(req.num_qubits, req.gates)
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/v1/execute-evolution-binary")
+async def execute_evolution_binary(req: ExecuteRequest) -> Response:
+    """
+    Binary variant of /execute-evolution for large circuits.
+    Returns a (num_qubits, num_states) uint32 header followed by complex64 amplitudes.
+    """
+    try:
+        payload = await asyncio.get_running_loop().run_in_executor(
+            EXECUTOR, get_state_evolution_binary, req.num_qubits, req.gates
+        )
+        return Response(content=payload, media_type="application/octet-stream")
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    # This line MUST be indented
     uvicorn.run(app, host=HOST, port=PORT)
\ No newline at end of file
@@ -18,12 +18,13 @@ class ExecuteRequest(BaseModel):
     shots: int = Field(1024, ge=1, le=1_000_000)
     memory: bool = Field(default=False)
     backend: Optional[str] = Field(default=None, description="Override backend name")
+    return_probabilities: bool = Field(default=False, description="Also return counts / shots per outcome")
 
 
 class ExecuteResponse(BaseModel):
     backend: str
     shots: int
     counts: Dict[str, int]
-    probabilities: Dict[str, float]
+    probabilities: Optional[Dict[str, float]] = None
     memory: Optional[List[str]] = None
     status: str = "success"
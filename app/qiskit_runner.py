@@ -1,227 +1,741 @@
-import os
-from typing import Dict, Optional, List, Any
-from dotenv import load_dotenv
-from collections import defaultdict
-
-# --- Fixed Imports ---
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
-from qiskit.quantum_info import Statevector
-# ---------------------
-
-
-def _get_angle(value: Any) -> float:
-    try:
-        angle = float(value)
-    except Exception:
-        raise ValueError(f"Invalid angle value: {value}")
-    import math
-    # Heuristic: treat as radians if within [-2pi, 2pi], else assume degrees
-    if abs(angle) <= 2 * math.pi:
-        return angle
-    return angle * math.pi / 180.0
-
-
-def _apply_gate(qc, gate: Dict[str, Any]):
-    gtype = gate.get("type")
-    qubit = gate.get("qubit")
-    params = gate.get("params") or {}
-    targets: List[int] = list(gate.get("targets") or [])
-    controls: List[int] = list(gate.get("controls") or [])
-
-    # Single-qubit gates
-    if gtype == "h":
-        qc.h(qubit)
-    elif gtype == "x":
-        qc.x(qubit)
-    elif gtype == "y":
-        qc.y(qubit)
-    elif gtype == "z":
-        qc.z(qubit)
-    elif gtype == "s":
-        qc.s(qubit)
-    elif gtype == "t":
-        qc.t(qubit)
-    elif gtype == "rx":
-        angle = _get_angle(params.get("theta") or params.get("angle") or 0)
-        qc.rx(angle, qubit)
-    elif gtype == "ry":
-        angle = _get_angle(params.get("theta") or params.get("angle") or 0)
-        qc.ry(angle, qubit)
-    elif gtype == "rz":
-        angle = _get_angle(params.get("phi") or params.get("lambda") or params.get("angle") or 0)
-        qc.rz(angle, qubit)
-    elif gtype == "p":  # general U1/phase gate
-        angle = _get_angle(params.get("phi") or params.get("lambda") or params.get("angle") or 0)
-        qc.p(angle, qubit)
-    # Two-qubit gates
-    elif gtype == "cnot" or gtype == "cx":
-        control = qubit if qubit is not None else (controls[0] if controls else None)
-        target = targets[0] if targets else None
-        if control is None or target is None:
-            raise ValueError("CNOT requires control (qubit/controls[0]) and targets[0]")
-        qc.cx(control, target)
-    elif gtype == "cz":
-        control = qubit if qubit is not None else (controls[0] if controls else None)
-        target = targets[0] if targets else None
-        if control is None or target is None:
-            raise ValueError("CZ requires control and target")
-        qc.cz(control, target)
-    elif gtype == "swap":
-        q1 = qubit if qubit is not None else (targets[0] if targets else None)
-        q2 = targets[0] if targets else (controls[0] if controls else None)
-        if q1 is None or q2 is None:
-            raise ValueError("SWAP requires two qubits (qubit & targets[0] or targets[0] & controls[0])")
-        qc.swap(q1, q2)
-    # Three-qubit gate
-    elif gtype == "toffoli" or gtype == "ccx":
-        if len(controls) < 2 or len(targets) < 1:
-            raise ValueError("Toffoli requires controls[0], controls[1], targets[0]")
-        qc.ccx(controls[0], controls[1], targets[0])
-    else:
-        pass
-
-
-def _get_aer_backend(backend_name: str):
-    # Prefer modern AerSimulator
-    try:
-        from qiskit_aer import AerSimulator
-        if backend_name == "aer_simulator":
-            return AerSimulator()
-    except Exception:
-        pass
-
-    # Fallback to Aer.get_backend
-    try:
-        return Aer.get_backend(backend_name)
-    except Exception:
-        # Legacy fallback
-        try:
-            return Aer.get_backend("qasm_simulator")
-        except Exception as e:
-            raise RuntimeError(f"Unable to get backend '{backend_name}': {e}")
-
-
-def run_circuit(
-    num_qubits: int,
-    gates: List[Dict[str, Any]],
-    shots: int = 1024,
-    memory: bool = False,
-    override_backend: Optional[str] = None,
-) -> Dict:
-    load_dotenv()
-
-    backend_name = override_backend or os.getenv("QISKIT_BACKEND", "aer_simulator")
-
-    # Build circuit
-    qc = QuantumCircuit(num_qubits, num_qubits)
-
-    # Apply gates sorted by position, stable order
-    def sort_key(g):
-        p = g.get("position")
-        return p if isinstance(p, int) else 0
-
-    for g in sorted(gates, key=sort_key):
-        _apply_gate(qc, g)
-
-    # Measure all qubits into classical bits
-    qc.measure(range(num_qubits), range(num_qubits))
-
-    # Execute
-    backend = _get_aer_backend(backend_name)
-    tcirc = transpile(qc, backend)
-
-    try:
-        job = backend.run(tcirc, shots=int(shots), memory=bool(memory))
-        result = job.result()
-    except Exception as e:
-        raise RuntimeError(f"Execution failed: {e}")
-
-    counts = result.get_counts()
-    if not isinstance(counts, dict):
-        if isinstance(counts, list) and counts:
-            counts = counts[0]
-        else:
-            raise RuntimeError("Unexpected counts format from Qiskit result")
-
-    total = float(shots) if shots else sum(counts.values())
-    probabilities = {str(k): (int(v) / total) for k, v in counts.items()}
-
-    memory_out = None
-    try:
-        if memory:
-            mem = result.get_memory()
-            memory_out = mem[0] if isinstance(mem, list) else mem
-    except Exception:
-        memory_out = None
-
-    return {
-        "backend": backend_name,
-        "shots": int(shots),
-        "counts": {str(k): int(v) for k, v in counts.items()},
-        "probabilities": {str(k): float(v) for k, v in probabilities.items()},
-        "memory": memory_out,
-    }
-
-#
-# --- THIS IS THE NEW, CORRECTED HACKATHON FUNCTION ---
-#
-def get_state_evolution(
-    num_qubits: int,
-    gates: List[Dict[str, Any]],
-) -> Dict:
-    """
-    Computes the statevector after each column of gates.
-    This fulfills Task (a) of the hackathon.
-    """
-    
-    # 1. Group gates by their column "position"
-    columns = defaultdict(list)
-    for g in gates:
-        pos = g.get("position")
-        if pos is None:
-            pos = 0  # Default to column 0 if not specified
-        columns[pos].append(g)
-
-    # 2. Initialize the circuit and state
-    qc = QuantumCircuit(num_qubits)
-    snapshots = []
-
-    # 3. Get the initial state |0...0>
-    try:
-        # Calculate the initial statevector directly
-        initial_sv = Statevector(qc)
-        initial_state_vec = [f"{c.real:.5f}{c.imag:+.5f}j" for c in initial_sv.data]
-        snapshots.append(initial_state_vec)
-        
-    except Exception as e:
-        raise RuntimeError(f"Failed to get initial statevector: {e}")
-
-    # 4. Loop through each column, apply gates, and save snapshot
-    # We sort the columns to ensure correct order
-    for col_index in sorted(columns.keys()):
-        
-        # Apply all gates in this specific column
-        for gate in columns[col_index]:
-            try:
-                # Use the existing helper function to apply the gate
-                _apply_gate(qc, gate)
-            except Exception as e:
-                # Ignore gates that fail, for robustness
-                print(f"Skipping gate {gate.get('type')}: {e}")
-
-        # 5. Get the statevector *directly from the circuit*
-        try:
-            current_statevector = Statevector(qc)
-            
-            # Convert statevector to the JSON-friendly list of strings
-            state_list = [f"{c.real:.5f}{c.imag:+.5f}j" for c in current_statevector.data]
-            snapshots.append(state_list)
-            
-        except Exception as e:
-            raise RuntimeError(f"Failed to get statevector at column {col_index}: {e}")
-
-    # 6. Return the final dictionary as required
-    return {
-        "intermediateStates": snapshots
-    }
\ No newline at end of file
+import logging
+import math
+import os
+import struct
+from typing import Dict, Optional, List, Any, Iterator, Tuple, Union
+from dotenv import load_dotenv
+from collections import Counter
+from functools import lru_cache
+from itertools import groupby
+
+import numpy as np
+
+from . import kernels
+from .models import GateModel
+
+# --- Fixed Imports ---
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit import Instruction, ParameterVector
+from qiskit.circuit.library import (
+    CCXGate, CXGate, CZGate, HGate, PhaseGate, RXGate, RYGate, RZGate,
+    SGate, SwapGate, TGate, XGate, YGate, ZGate,
+)
+from qiskit_aer import Aer, AerSimulator
+from qiskit.quantum_info import Statevector
+# ---------------------
+
+
+logger = logging.getLogger(__name__)
+
+# Read .env once at import, before the env-configurable settings below
+load_dotenv()
+
+# Backend used when a request does not name one
+_DEFAULT_BACKEND = os.getenv("QISKIT_BACKEND", "aer_simulator")
+
+_BACKEND = AerSimulator()
+_STATEVECTOR_BACKEND = AerSimulator(method="statevector")
+
+
+def _load_gpu_backend():
+    # Opt-in GPU statevector backend (cuStateVec via Aer); None means CPU only
+    if os.getenv("QUANTUMFLOW_GPU") != "1":
+        return None
+    try:
+        import cupy  # noqa: F401
+    except ImportError:
+        return None
+    try:
+        if "GPU" not in _STATEVECTOR_BACKEND.available_devices():
+            return None
+        return AerSimulator(method="statevector", device="GPU")
+    except Exception:
+        return None
+
+
+_GPU_BACKEND = _load_gpu_backend()
+
+# Below this size Statevector.evolve() beats Aer's per-job overhead
+AER_EVOLUTION_MIN_QUBITS = int(os.getenv("AER_EVOLUTION_MIN_QUBITS", "16"))
+
+# Up to this size the Numba kernels (when installed) skip Qiskit altogether
+NUMBA_MAX_QUBITS = int(os.getenv("NUMBA_MAX_QUBITS", "16"))
+
+# From this size evolution runs on the GPU backend, when enabled
+GPU_MIN_QUBITS = int(os.getenv("GPU_MIN_QUBITS", "22"))
+
+# From this size the compiled AVX2 kernel (app/svkernel.c), when built, is used
+SVKERNEL_MIN_QUBITS = int(os.getenv("SVKERNEL_MIN_QUBITS", "18"))
+
+_TWO_PI = 2.0 * math.pi
+_DEG2RAD = math.pi / 180.0
+
+# Up to this size /execute samples the final statevector instead of running Aer
+SAMPLING_MAX_QUBITS = int(os.getenv("SAMPLING_MAX_QUBITS", "14"))
+
+# Bound once so formatting a statevector needs no per-amplitude attribute lookups
+_AMPLITUDE_FORMAT = "{:.5f}{:+.5f}j".format
+
+# Place values of the five fractional digits in a fixed-width amplitude field
+_FRACTION_PLACES = 10 ** np.arange(4, -1, -1, dtype=np.int64)
+
+# Binary evolution payload header: (num_qubits, num_states)
+_EVOLUTION_HEADER = struct.Struct("<II")
+
+
+# Gates arrive either as plain dicts or as the request's GateModel instances
+Gate = Union[Dict[str, Any], GateModel]
+
+
+def _field(gate: Gate, name: str) -> Any:
+    # Read a gate attribute without materializing a dict per gate
+    if isinstance(gate, dict):
+        return gate.get(name)
+    return getattr(gate, name, None)
+
+
+@lru_cache(maxsize=1024)
+def _get_angle(value: Any) -> float:
+    try:
+        angle = float(value)
+    except Exception:
+        raise ValueError(f"Invalid angle value: {value}")
+    # Heuristic: treat as radians if within [-2pi, 2pi], else assume degrees
+    return angle if -_TWO_PI <= angle <= _TWO_PI else angle * _DEG2RAD
+
+
+def _control_target_qargs(qubit, targets: List[int], controls: List[int]) -> Optional[List[int]]:
+    control = qubit if qubit is not None else (controls[0] if controls else None)
+    target = targets[0] if targets else None
+    if control is None or target is None:
+        return None
+    return [control, target]
+
+
+def _swap_qargs(qubit, targets: List[int], controls: List[int]) -> Optional[List[int]]:
+    q1 = qubit if qubit is not None else (targets[0] if targets else None)
+    q2 = targets[0] if targets else (controls[0] if controls else None)
+    if q1 is None or q2 is None:
+        return None
+    return [q1, q2]
+
+
+def _toffoli_qargs(qubit, targets: List[int], controls: List[int]) -> Optional[List[int]]:
+    if len(controls) < 2 or len(targets) < 1:
+        return None
+    return [controls[0], controls[1], targets[0]]
+
+
+# Gate type -> instruction, looked up once per gate instead of an if/elif chain
+_SINGLE_QUBIT_GATES = {
+    "h": HGate(),
+    "x": XGate(),
+    "y": YGate(),
+    "z": ZGate(),
+    "s": SGate(),
+    "t": TGate(),
+}
+
+# Gate type -> (gate class, param names tried in order for the angle)
+_ROTATION_GATES = {
+    "rx": (RXGate, ("theta", "angle")),
+    "ry": (RYGate, ("theta", "angle")),
+    "rz": (RZGate, ("phi", "lambda", "angle")),
+    "p": (PhaseGate, ("phi", "lambda", "angle")),  # general U1/phase gate
+}
+
+# Gate type -> (instruction, qargs resolver, error raised when operands are missing)
+_MULTI_QUBIT_GATES = {
+    "cx": (CXGate(), _control_target_qargs, "CNOT requires control (qubit/controls[0]) and targets[0]"),
+    "cnot": (CXGate(), _control_target_qargs, "CNOT requires control (qubit/controls[0]) and targets[0]"),
+    "cz": (CZGate(), _control_target_qargs, "CZ requires control and target"),
+    "swap": (SwapGate(), _swap_qargs, "SWAP requires two qubits (qubit & targets[0] or targets[0] & controls[0])"),
+    "ccx": (CCXGate(), _toffoli_qargs, "Toffoli requires controls[0], controls[1], targets[0]"),
+    "toffoli": (CCXGate(), _toffoli_qargs, "Toffoli requires controls[0], controls[1], targets[0]"),
+}
+
+
+def _rotation_angle(gate: Gate) -> float:
+    # First non-zero param among the gate type's angle names, in radians
+    params = _field(gate, "params") or {}
+    for name in _ROTATION_GATES[_field(gate, "type")][1]:
+        if params.get(name):
+            return _get_angle(params[name])
+    return _get_angle(0)
+
+
+def _gate_instruction(gate: Gate) -> Optional[Tuple[Instruction, List[int]]]:
+    """
+    Translates a gate into the (Instruction, qargs) pair to apply.
+    Returns None for unsupported gate types.
+    """
+    gtype = _field(gate, "type")
+    qubit = _field(gate, "qubit")
+
+    # Single-qubit gates
+    instr = _SINGLE_QUBIT_GATES.get(gtype)
+    if instr is not None:
+        return instr, [qubit]
+
+    rotation = _ROTATION_GATES.get(gtype)
+    if rotation is not None:
+        return rotation[0](_rotation_angle(gate)), [qubit]
+
+    # Two- and three-qubit gates
+    multi = _MULTI_QUBIT_GATES.get(gtype)
+    if multi is not None:
+        instr, resolve_qargs, error = multi
+        qargs = resolve_qargs(qubit, list(_field(gate, "targets") or []), list(_field(gate, "controls") or []))
+        if qargs is None:
+            raise ValueError(error)
+        return instr, qargs
+
+    return None
+
+
+_UNITARY_GATE_TYPES = frozenset(_SINGLE_QUBIT_GATES) | frozenset(_ROTATION_GATES) | frozenset(_MULTI_QUBIT_GATES)
+
+# Gates that are their own inverse: two identical ones in a row cancel
+_SELF_INVERSE_GATE_TYPES = frozenset({"h", "x", "y", "z", "cx", "cnot", "cz", "swap", "ccx", "toffoli"})
+
+# Rotations closer than this to the identity are not applied during evolution
+_IDENTITY_ANGLE_TOLERANCE = 1e-12
+
+
+def _gate_shape(gate: Gate) -> tuple:
+    # Hashable (type, qubit, targets, controls) identity of a gate, angles excluded
+    return (
+        _field(gate, "type"),
+        _field(gate, "qubit"),
+        tuple(_field(gate, "targets") or []),
+        tuple(_field(gate, "controls") or []),
+    )
+
+
+def _is_identity_rotation(gate: Gate) -> bool:
+    # rx/ry/rz/p(0) and p(2*pi*k) are exactly I. rx/ry/rz(2*pi) are -I, which
+    # flips the sign of every amplitude in the snapshot, so they are kept
+    gtype = _field(gate, "type")
+    if gtype not in _ROTATION_GATES:
+        return False
+    try:
+        angle = _rotation_angle(gate)
+    except ValueError:
+        return False  # left for _resolve_or_skip to report
+    if gtype == "p":
+        angle = math.remainder(angle, _TWO_PI)
+    return abs(angle) < _IDENTITY_ANGLE_TOLERANCE
+
+
+def _simplify_column(column: List[Gate]) -> List[Gate]:
+    """
+    Drops the gates of one column that leave the state unchanged: identity
+    rotations, and adjacent identical self-inverse gates (X.X, H.H, CX.CX, ...),
+    which cancel pairwise. Gates never cancel across columns, since every
+    column boundary is an observable snapshot.
+    """
+    kept: List[Gate] = []
+    for gate in column:
+        if _is_identity_rotation(gate):
+            continue
+        if (
+            kept
+            and _field(gate, "type") in _SELF_INVERSE_GATE_TYPES
+            and _gate_shape(kept[-1]) == _gate_shape(gate)
+        ):
+            kept.pop()
+            continue
+        kept.append(gate)
+    return kept
+
+
+def _resolve_or_skip(gate: Gate, num_qubits: int) -> Optional[Tuple[Instruction, List[int]]]:
+    """
+    Resolves a gate for the evolution engines and checks its qubits. Negative
+    indices count from the end, as QuantumCircuit.append does for /execute.
+    Gates that cannot be applied are logged and skipped (None), for robustness.
+    """
+    try:
+        op = _gate_instruction(gate)
+        if op is None:
+            return None
+        instr, qargs = op
+        if not all(isinstance(q, int) and -num_qubits <= q < num_qubits for q in qargs):
+            raise ValueError(f"Invalid qubits {qargs} for {instr.name}")
+        # The kernels need non-negative bit positions
+        resolved = [q % num_qubits for q in qargs]
+        if len(set(resolved)) != len(resolved):
+            raise ValueError(f"Invalid qubits {qargs} for {instr.name}")
+        return instr, resolved
+    except Exception as e:
+        logger.warning("Skipping gate %s: %s", _field(gate, "type"), e)
+        return None
+
+
+def _apply_gate(qc, gate: Gate):
+    op = _gate_instruction(gate)
+    if op is not None:
+        qc.append(*op)
+
+
+_BACKENDS: Dict[str, Any] = {"aer_simulator": _BACKEND}
+
+
+def _get_aer_backend(backend_name: str):
+    # Backends are stateless between runs, so build each one once per process.
+    # Cached under the name of the backend actually loaded: unknown (client
+    # supplied) names fall back to qasm_simulator and must not add entries
+    backend = _BACKENDS.get(backend_name)
+    if backend is None:
+        backend = _load_aer_backend(backend_name)
+        backend = _BACKENDS.setdefault(backend.name, backend)
+    return backend
+
+
+def _resolve_backend_name(backend_name: str) -> str:
+    # Name of the backend that will run the circuit, e.g. "qasm_simulator" for unknown names
+    if backend_name in _BACKENDS:
+        return backend_name
+    return _get_aer_backend(backend_name).name
+
+
+def _load_aer_backend(backend_name: str):
+    # Fallback to Aer.get_backend
+    try:
+        return Aer.get_backend(backend_name)
+    except Exception:
+        # Legacy fallback
+        try:
+            return Aer.get_backend("qasm_simulator")
+        except Exception as e:
+            raise RuntimeError(f"Unable to get backend '{backend_name}': {e}")
+
+
+def _circuit_key(num_qubits: int, gates: List[Gate]) -> Tuple[tuple, tuple]:
+    """
+    Splits a circuit into its hashable shape (qubit count and, per gate in
+    application order, type/qubit/targets/controls) and its rotation angles
+    in radians. Circuits that differ only in angles share a shape.
+    """
+    def sort_key(g):
+        p = _field(g, "position")
+        return p if isinstance(p, int) else 0
+
+    ordered = sorted(gates, key=sort_key)
+    shape = (num_qubits, tuple(_gate_shape(g) for g in ordered))
+    angles = tuple(_rotation_angle(g) for g in ordered if _field(g, "type") in _ROTATION_GATES)
+    return shape, angles
+
+
+def _build_circuit(shape: tuple, angles, measure: bool = True) -> QuantumCircuit:
+    # `angles` holds one float or Parameter per rotation gate, in order
+    num_qubits, gate_shapes = shape
+    angle_iter = iter(angles)
+
+    # Build circuit
+    qc = QuantumCircuit(num_qubits, num_qubits) if measure else QuantumCircuit(num_qubits)
+    for gtype, qubit, targets, controls in gate_shapes:
+        rotation = _ROTATION_GATES.get(gtype)
+        if rotation is not None:
+            qc.append(rotation[0](next(angle_iter)), [qubit])
+            continue
+        _apply_gate(qc, {
+            "type": gtype,
+            "qubit": qubit,
+            "targets": targets,
+            "controls": controls,
+        })
+
+    if measure:
+        # Measure all qubits into classical bits. This is already a single bulk
+        # call: measure(qc.qubits, qc.clbits) is no faster, and measure_all()
+        # is slower because it also inserts a barrier
+        qc.measure(range(num_qubits), range(num_qubits))
+
+    return qc
+
+
+@lru_cache(maxsize=1024)
+def _transpile_parametric(backend_name: str, shape: tuple) -> Tuple[QuantumCircuit, tuple]:
+    # Transpile once per shape with a Parameter in place of every rotation angle
+    num_rotations = sum(1 for gate_shape in shape[1] if gate_shape[0] in _ROTATION_GATES)
+    params = ParameterVector("angle", num_rotations)
+    tcirc = transpile(_build_circuit(shape, params), _get_aer_backend(backend_name), optimization_level=0)
+    return tcirc, tuple(params)
+
+
+def _transpile_cached(backend_name: str, circuit_key: Tuple[tuple, tuple]) -> QuantumCircuit:
+    shape, angles = circuit_key
+    tcirc, params = _transpile_parametric(backend_name, shape)
+    if not params:
+        return tcirc
+    return tcirc.assign_parameters(dict(zip(params, angles)))
+
+
+def _can_sample_statevector(backend_name: str, circuit_key: tuple) -> bool:
+    # Small, purely unitary circuits on the ideal simulator can be sampled
+    # straight from the final state, skipping transpile and the Aer job
+    num_qubits, gate_shapes = circuit_key[0]
+    return (
+        backend_name == "aer_simulator"
+        and num_qubits <= SAMPLING_MAX_QUBITS
+        and all(gate_shape[0] in _UNITARY_GATE_TYPES for gate_shape in gate_shapes)
+    )
+
+
+def _execution_result(backend_name: str, shots: int, counts: Dict[str, int], memory_out: Optional[List[str]]) -> Dict:
+    # Probabilities are counts / shots, so they are only added on request
+    return {
+        "backend": backend_name,
+        "shots": int(shots),
+        "counts": counts,
+        "memory": memory_out,
+    }
+
+
+def probabilities_from_counts(counts: Dict[str, int], shots: int) -> Dict[str, float]:
+    total = float(shots) if shots else sum(counts.values())
+    return {k: v / total for k, v in counts.items()}
+
+
+def prepare_circuit(
+    num_qubits: int,
+    gates: List[Gate],
+    override_backend: Optional[str] = None,
+) -> Tuple[str, tuple]:
+    """
+    Resolves the backend name and reduces the circuit to its structural key.
+    The key is plain, picklable data; run_batch builds it from a transpiled
+    circuit cached per shape, so it can be handed to a worker process.
+    """
+    backend_name = _resolve_backend_name(override_backend or _DEFAULT_BACKEND)
+    return backend_name, _circuit_key(num_qubits, gates)
+
+
+def run_batch(
+    backend_name: str,
+    circuit_keys: List[tuple],
+    shots: int = 1024,
+    memory: bool = False,
+) -> List[Union[Dict, Exception]]:
+    """
+    Executes circuits in a single backend.run() call and splits the result
+    back into one response dict per circuit. A circuit that fails to build
+    gets its exception in place of a result, so it cannot fail the batch.
+    Small unitary circuits are sampled from their statevector instead.
+    """
+    outputs: List[Union[Dict, Exception, None]] = [None] * len(circuit_keys)
+    circuits = []
+    indices = []
+    for i, key in enumerate(circuit_keys):
+        try:
+            if _can_sample_statevector(backend_name, key):
+                sv = Statevector(_build_circuit(*key, measure=False))
+                memory_out = [str(m) for m in sv.sample_memory(int(shots))] if memory else None
+                if memory:
+                    counts = dict(Counter(memory_out))
+                else:
+                    # Sampled counts carry numpy str/int types; convert once here
+                    counts = {str(k): int(v) for k, v in sv.sample_counts(int(shots)).items()}
+                outputs[i] = _execution_result(backend_name, shots, counts, memory_out)
+            else:
+                circuits.append(_transpile_cached(backend_name, key))
+                indices.append(i)
+        except Exception as e:
+            outputs[i] = e
+
+    if not circuits:
+        return outputs
+
+    backend = _get_aer_backend(backend_name)
+    try:
+        job = backend.run(circuits, shots=int(shots), memory=bool(memory))
+        result = job.result()
+    except Exception as e:
+        raise RuntimeError(f"Execution failed: {e}")
+
+    for j, i in enumerate(indices):
+        counts = result.get_counts(j)
+        if not isinstance(counts, dict):
+            raise RuntimeError("Unexpected counts format from Qiskit result")
+
+        memory_out = None
+        try:
+            if memory:
+                memory_out = list(result.get_memory(j))
+        except Exception:
+            memory_out = None
+
+        outputs[i] = _execution_result(backend_name, shots, counts, memory_out)
+    return outputs
+
+
+def run_circuit(
+    num_qubits: int,
+    gates: List[Gate],
+    shots: int = 1024,
+    memory: bool = False,
+    override_backend: Optional[str] = None,
+    return_probabilities: bool = False,
+) -> Dict:
+    backend_name, key = prepare_circuit(num_qubits, gates, override_backend)
+    result = run_batch(backend_name, [key], shots=shots, memory=memory)[0]
+    if isinstance(result, Exception):
+        raise result
+    if return_probabilities:
+        result["probabilities"] = probabilities_from_counts(result["counts"], shots)
+    return result
+
+
+def _write_fixed_digits(values: np.ndarray, buf: np.ndarray, col: int) -> np.ndarray:
+    # Writes |values| as "d.ddddd" into buf[:, col:col + 7]. Returns the mask of
+    # entries rendered exactly; the rest (|x| >= 10, non-finite, or within
+    # rounding error of a half-way case) must go through str.format instead.
+    scaled = np.abs(values) * 1e5
+    exact = np.isfinite(scaled) & (scaled < 999999.5)
+    scaled = np.where(exact, scaled, 0.0)
+    exact &= np.abs(scaled - np.floor(scaled) - 0.5) > 1e-6
+    fixed = np.rint(scaled).astype(np.int64)
+    buf[:, col] = 48 + fixed // 100000 % 10
+    buf[:, col + 1] = ord(".")
+    buf[:, col + 2:col + 7] = 48 + fixed[:, None] // _FRACTION_PLACES % 10
+    return exact
+
+
+def _format_statevector(data: np.ndarray) -> List[str]:
+    """
+    Formats amplitudes as "{re:.5f}{im:+.5f}j" strings. All rows are written into
+    one preallocated ASCII buffer, decoded once and split, so no per-amplitude
+    Python formatting runs except for the rare values the fast path can't render.
+    """
+    n = data.shape[0]
+    re, im = data.real, data.imag
+    # Row layout: [-]d.ddddd(+|-)d.dddddj\n; the '-' is dropped for non-negative reals
+    buf = np.empty((n, 18), dtype=np.uint8)
+    buf[:, 0] = ord("-")
+    exact = _write_fixed_digits(re, buf, 1)
+    buf[:, 8] = np.where(np.signbit(im), ord("-"), ord("+"))
+    exact &= _write_fixed_digits(im, buf, 9)
+    buf[:, 16] = ord("j")
+    buf[:, 17] = ord("\n")
+
+    keep = np.ones((n, 18), dtype=bool)
+    keep[:, 0] = np.signbit(re)
+    formatted = buf[keep].tobytes().decode("ascii").split("\n")
+    formatted.pop()
+    for i in np.flatnonzero(~exact).tolist():
+        formatted[i] = _AMPLITUDE_FORMAT(re[i], im[i])
+    return formatted
+
+
+def _evolve_with_statevector(num_qubits: int, columns: List[List[Gate]]) -> Iterator[np.ndarray]:
+    # Evolve one Statevector gate by gate; cheapest for small registers
+    sv = Statevector.from_int(0, 2 ** num_qubits)
+    yield sv.data
+
+    for column in columns:
+        for gate in column:
+            op = _resolve_or_skip(gate, num_qubits)
+            if op is not None:
+                instr, qargs = op
+                sv = sv.evolve(instr, qargs=qargs)
+
+        # evolve() returns a new array each time, so no copy is needed
+        yield sv.data
+
+
+# Instruction name -> (2x2 matrix on the last qarg, number of leading control qargs)
+_KERNEL_CONTROLLED = {
+    "cx": (XGate().to_matrix(), 1),
+    "cz": (ZGate().to_matrix(), 1),
+    "ccx": (XGate().to_matrix(), 2),
+}
+_KERNEL_MATRICES = {instr.name: instr.to_matrix() for instr in _SINGLE_QUBIT_GATES.values()}
+_KERNEL_MATRICES["swap"] = SwapGate().to_matrix()
+
+
+def _apply_kernel(state, instr: Instruction, qargs: List[int], apply_1q, apply_2q):
+    # qargs have been checked by _resolve_or_skip
+    if instr.name == "swap":
+        apply_2q(state, _KERNEL_MATRICES["swap"], qargs[0], qargs[1])
+        return
+
+    controlled = _KERNEL_CONTROLLED.get(instr.name)
+    if controlled is not None:
+        mat, num_controls = controlled
+        cmask = 0
+        for q in qargs[:num_controls]:
+            cmask |= 1 << q
+        apply_1q(state, mat, qargs[-1], cmask)
+        return
+
+    mat = _KERNEL_MATRICES.get(instr.name)
+    if mat is None:
+        mat = instr.to_matrix()  # rotations: computed once per gate
+    apply_1q(state, mat, qargs[0], 0)
+
+
+def _evolve_in_place(num_qubits: int, columns: List[List[Gate]], state, snapshot, apply_1q, apply_2q) -> Iterator[np.ndarray]:
+    # Shared column loop for the in-place kernels in app/kernels.py
+    yield snapshot(state)
+
+    for column in columns:
+        for gate in column:
+            op = _resolve_or_skip(gate, num_qubits)
+            if op is not None:
+                _apply_kernel(state, *op, apply_1q, apply_2q)
+
+        yield snapshot(state)
+
+
+def _evolve_with_kernels(num_qubits: int, columns: List[List[Gate]]) -> Iterator[np.ndarray]:
+    # Numba kernels on a complex128 state, bypassing Qiskit entirely
+    state = np.zeros(2 ** num_qubits, dtype=np.complex128)
+    state[0] = 1.0
+    return _evolve_in_place(num_qubits, columns, state, np.copy, kernels.apply_1q, kernels.apply_2q)
+
+
+def _evolve_with_svkernel(num_qubits: int, columns: List[List[Gate]]) -> Iterator[np.ndarray]:
+    # AVX2 C kernels on split real/imag arrays
+    return _evolve_in_place(
+        num_qubits, columns, kernels.svkernel_init(num_qubits), kernels.svkernel_snapshot,
+        kernels.svkernel_apply_1q, kernels.svkernel_apply_2q,
+    )
+
+
+def _evolve_with_aer(num_qubits: int, columns: List[List[Gate]], backend=_STATEVECTOR_BACKEND) -> List[np.ndarray]:
+    # Build one circuit that saves the state after every column, so Aer keeps
+    # the state resident and records each snapshot in place
+    qc = QuantumCircuit(num_qubits)
+    labels = ["initial"]
+    qc.save_statevector(label="initial")
+
+    for col_index, column in enumerate(columns):
+        for gate in column:
+            op = _resolve_or_skip(gate, num_qubits)
+            if op is not None:
+                qc.append(*op)
+
+        label = f"col{col_index}"
+        qc.save_statevector(label=label)
+        labels.append(label)
+
+    # Simulate once and collect every saved state
+    try:
+        tcirc = transpile(qc, backend, optimization_level=0)
+        data = backend.run(tcirc).result().data(0)
+    except Exception as e:
+        raise RuntimeError(f"Failed to simulate state evolution: {e}")
+
+    return [np.asarray(data[label].data) for label in labels]
+
+
+def _iter_statevectors(
+    num_qubits: int,
+    gates: List[Gate],
+) -> Iterator[np.ndarray]:
+    """
+    Yields the raw statevector after each column of gates as it is computed.
+    The first entry is the initial state |0...0>.
+    """
+
+    # 1. Group gates by their column "position" (default column 0) with one
+    # stable sort, so gates keep their order within a column
+    def column_of(g):
+        return _field(g, "position") or 0
+
+    ordered = [
+        _simplify_column(list(column))
+        for _, column in groupby(sorted(gates, key=column_of), key=column_of)
+    ]
+
+    # 2. Apply the columns that still have gates, in order. Small registers
+    # use the JIT kernels when Numba is installed, very large ones the GPU when
+    # enabled, large ones the AVX2 kernel when it has been built; Aer's fixed
+    # per-job cost only pays off once the state is large. Aer simulates every
+    # column up front; the other engines step one column per snapshot
+    applied = [column for column in ordered if column]
+    if kernels.NUMBA_AVAILABLE and num_qubits <= NUMBA_MAX_QUBITS:
+        states = _evolve_with_kernels(num_qubits, applied)
+    elif _GPU_BACKEND is not None and num_qubits >= GPU_MIN_QUBITS:
+        states = _evolve_with_aer(num_qubits, applied, backend=_GPU_BACKEND)
+    elif kernels.SVKERNEL_AVAILABLE and num_qubits >= SVKERNEL_MIN_QUBITS:
+        states = _evolve_with_svkernel(num_qubits, applied)
+    elif num_qubits >= AER_EVOLUTION_MIN_QUBITS:
+        states = _evolve_with_aer(num_qubits, applied)
+    else:
+        states = _evolve_with_statevector(num_qubits, applied)
+
+    # 3. Columns left empty reuse the previous snapshot rather than a copy of it
+    states = iter(states)
+    snapshot = next(states)
+    yield snapshot
+    for column in ordered:
+        if column:
+            snapshot = next(states)
+        yield snapshot
+
+
+def _evolve_statevectors(num_qubits: int, gates: List[Gate]) -> List[np.ndarray]:
+    return list(_iter_statevectors(num_qubits, gates))
+
+
+def iter_state_evolution(
+    num_qubits: int,
+    gates: List[Gate],
+) -> Iterator[List[str]]:
+    """
+    Yields each column's statevector as the list of strings used by
+    get_state_evolution, one snapshot at a time, for streaming responses.
+    """
+    previous, formatted = None, None
+    for data in _iter_statevectors(num_qubits, gates):
+        # A snapshot shared by consecutive (no-op) columns is formatted once
+        if data is not previous:
+            previous, formatted = data, _format_statevector(data)
+        yield formatted
+
+
+#
+# --- THIS IS THE NEW, CORRECTED HACKATHON FUNCTION ---
+#
+def get_state_evolution(
+    num_qubits: int,
+    gates: List[Gate],
+) -> Dict:
+    """
+    Computes the statevector after each column of gates.
+    This fulfills Task (a) of the hackathon.
+    """
+    # Convert each statevector to the JSON-friendly list of strings
+    return {
+        "intermediateStates": list(iter_state_evolution(num_qubits, gates))
+    }
+
+
+def get_state_evolution_binary(
+    num_qubits: int,
+    gates: List[Gate],
+) -> bytes:
+    """
+    Same snapshots as get_state_evolution, packed for the wire: a little-endian
+    uint32 header (num_qubits, num_states) followed by num_states * 2**num_qubits
+    complex64 amplitudes (interleaved float32 real/imag pairs).
+    """
+    snapshots = _evolve_statevectors(num_qubits, gates)
+    header = _EVOLUTION_HEADER.pack(num_qubits, len(snapshots))
+    return header + np.stack(snapshots).astype("<c8").tobytes()
+
+
+def warm_up_worker():
+    """
+    Process pool initializer: pushes a tiny circuit through every execution
+    path, so Qiskit, transpile, Aer and the JIT kernels are loaded before the
+    first real request reaches the worker.
+    """
+    gates = [{"type": "h", "qubit": 0}, {"type": "rx", "qubit": 0, "params": {"theta": 0.5}}]
+    key = _circuit_key(1, gates)
+    # run_batch samples a circuit this small, so also run one Aer job directly
+    run_batch("aer_simulator", [key], shots=1)
+    _BACKEND.run(_transpile_cached("aer_simulator", key), shots=1).result()
+    get_state_evolution(1, gates)
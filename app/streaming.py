@@ -0,0 +1,135 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import Executor
+from typing import Any, AsyncIterator, List, Optional
+
+import orjson
+
+from .qiskit_runner import Gate, iter_state_evolution
+
+
+# Lines buffered between the worker and the response. A full buffer pauses the
+# worker, which bounds server memory when the client reads slowly
+STREAM_BUFFER_LINES = int(os.getenv("STREAM_BUFFER_LINES", "4"))
+
+# A worker whose lines go unread this long (client connected but not reading)
+# abandons the stream, so stalled clients cannot hold pool workers indefinitely
+STREAM_STALL_SECONDS = float(os.getenv("STREAM_STALL_SECONDS", "30"))
+
+# How often blocked queue calls wake up to check for cancellation or a dead worker
+_POLL_SECONDS = 0.5
+
+
+def _put(lines, item: Any, cancelled) -> bool:
+    # Blocks until the item is queued; False when the client went away or
+    # stopped reading for STREAM_STALL_SECONDS first
+    deadline = time.monotonic() + STREAM_STALL_SECONDS
+    while not cancelled.is_set() and time.monotonic() < deadline:
+        try:
+            lines.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _produce_lines(num_qubits: int, gates: List[Gate], lines, cancelled) -> None:
+    """
+    Runs in a worker process: queues one NDJSON line {"col": i, "state": [...]}
+    per snapshot as soon as it is computed, then None. A failure is queued as
+    an exception in place of the remaining lines.
+    """
+    try:
+        for col, state in enumerate(iter_state_evolution(num_qubits, gates)):
+            line = orjson.dumps({"col": col, "state": state}, option=orjson.OPT_APPEND_NEWLINE)
+            if not _put(lines, line, cancelled):
+                return
+        _put(lines, None, cancelled)
+    except Exception as e:
+        # Rebuilt as a RuntimeError so it always pickles across the manager
+        _put(lines, RuntimeError(str(e)), cancelled)
+
+
+class EvolutionStreamer:
+    """
+    Streams state evolution snapshots computed on `executor` (a process pool)
+    through a bounded managed queue, so a response can start before the last
+    column is simulated and only a few snapshots are held at once.
+    """
+
+    def __init__(self, executor: Executor, buffer_lines: int = STREAM_BUFFER_LINES):
+        self._executor = executor
+        self._buffer_lines = max(1, buffer_lines)
+        self._manager = None
+
+    def _get_manager(self):
+        # Started on first use, so worker processes importing this module never start one
+        if self._manager is None:
+            self._manager = multiprocessing.get_context("spawn").Manager()
+        return self._manager
+
+    def shutdown(self):
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    async def open(self, num_qubits: int, gates: List[Gate]) -> AsyncIterator[bytes]:
+        """
+        Starts the evolution and waits for its first line, so failures before
+        any output raise here instead of cutting a response short. Returns an
+        iterator over every NDJSON line, starting with that first one.
+        """
+        loop = asyncio.get_running_loop()
+
+        def make_channel():
+            manager = self._get_manager()
+            return manager.Queue(self._buffer_lines), manager.Event()
+
+        lines, cancelled = await loop.run_in_executor(None, make_channel)
+        worker = loop.run_in_executor(self._executor, _produce_lines, num_qubits, gates, lines, cancelled)
+
+        try:
+            first = await self._next(lines, worker)
+        except BaseException:
+            cancelled.set()
+            raise
+        if isinstance(first, Exception):
+            raise first
+        return self._relay(first, lines, cancelled, worker)
+
+    async def _next(self, lines, worker: asyncio.Future) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                return await loop.run_in_executor(None, lines.get, True, _POLL_SECONDS)
+            except queue.Empty:
+                # A worker that died (e.g. BrokenProcessPool) or gave up on a
+                # stalled client never sends its end marker
+                if worker.done():
+                    # The worker may have queued its last items (and returned)
+                    # after the timed get gave up, so look once more first
+                    try:
+                        return await loop.run_in_executor(None, lines.get_nowait)
+                    except queue.Empty:
+                        pass
+                    worker.result()
+                    raise RuntimeError("State evolution stopped without finishing")
+
+    async def _relay(self, item: Any, lines, cancelled, worker: asyncio.Future) -> AsyncIterator[bytes]:
+        try:
+            while item is not None:
+                if isinstance(item, Exception):
+                    # The status line has already been sent; report the failure in-band
+                    yield orjson.dumps({"status": "error", "detail": str(item)}, option=orjson.OPT_APPEND_NEWLINE)
+                    return
+                yield item
+                try:
+                    item = await self._next(lines, worker)
+                except Exception as e:
+                    item = e
+        finally:
+            # Stops the worker early when the client disconnects mid-stream
+            cancelled.set()
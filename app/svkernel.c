@@ -0,0 +1,146 @@
+/*
+ * Statevector gate kernels on split real/imag (SoA) arrays, loaded by
+ * app/kernels.py through ctypes. Amplitude index bit k is qubit k.
+ *
+ * Build instructions are in README.md. The AVX2/FMA loop is compiled with a
+ * per-function target attribute and only called when the CPU reports both
+ * features, so the library must be built WITHOUT -mavx2/-march=native.
+ */
+#include <stddef.h>
+#include <stdint.h>
+
+#if (defined(__GNUC__) || defined(__clang__)) && (defined(__x86_64__) || defined(__i386__))
+#define SVKERNEL_X86 1
+#include <immintrin.h>
+#endif
+
+/* Insert a 0 bit at position `bit` of k. */
+static inline uint64_t insert_zero(uint64_t k, int bit)
+{
+    uint64_t low = (1ULL << bit) - 1;
+    return ((k & ~low) << 1) | (k & low);
+}
+
+static inline void apply_1q_pair(double *re, double *im, const double *gr, const double *gi,
+                                 uint64_t i, uint64_t j)
+{
+    double r0 = re[i], i0 = im[i], r1 = re[j], i1 = im[j];
+    re[i] = gr[0] * r0 - gi[0] * i0 + gr[1] * r1 - gi[1] * i1;
+    im[i] = gr[0] * i0 + gi[0] * r0 + gr[1] * i1 + gi[1] * r1;
+    re[j] = gr[2] * r0 - gi[2] * i0 + gr[3] * r1 - gi[3] * i1;
+    im[j] = gr[2] * i0 + gi[2] * r0 + gr[3] * i1 + gi[3] * r1;
+}
+
+#ifdef SVKERNEL_X86
+static int cpu_has_avx2_fma(void)
+{
+    static int supported = -1;
+    if (supported < 0) {
+        __builtin_cpu_init();
+        supported = __builtin_cpu_supports("avx2") && __builtin_cpu_supports("fma");
+    }
+    return supported;
+}
+
+/* Four amplitude pairs per iteration; requires target >= 2 and (cmask & 3) == 0. */
+__attribute__((target("avx2,fma")))
+static void apply_1q_avx2(double *re, double *im, const double gr[4], const double gi[4],
+                          int target, uint64_t cmask, uint64_t npairs)
+{
+    uint64_t m = 1ULL << target;
+    __m256d g00r = _mm256_set1_pd(gr[0]), g00i = _mm256_set1_pd(gi[0]);
+    __m256d g01r = _mm256_set1_pd(gr[1]), g01i = _mm256_set1_pd(gi[1]);
+    __m256d g10r = _mm256_set1_pd(gr[2]), g10i = _mm256_set1_pd(gi[2]);
+    __m256d g11r = _mm256_set1_pd(gr[3]), g11i = _mm256_set1_pd(gi[3]);
+    for (uint64_t k = 0; k < npairs; k += 4) {
+        uint64_t i = insert_zero(k, target);
+        if ((i & cmask) != cmask)
+            continue;
+        uint64_t j = i | m;
+        __m256d r0 = _mm256_loadu_pd(re + i), i0 = _mm256_loadu_pd(im + i);
+        __m256d r1 = _mm256_loadu_pd(re + j), i1 = _mm256_loadu_pd(im + j);
+
+        __m256d nr0 = _mm256_mul_pd(g00r, r0);
+        nr0 = _mm256_fnmadd_pd(g00i, i0, nr0);
+        nr0 = _mm256_fmadd_pd(g01r, r1, nr0);
+        nr0 = _mm256_fnmadd_pd(g01i, i1, nr0);
+        __m256d ni0 = _mm256_mul_pd(g00r, i0);
+        ni0 = _mm256_fmadd_pd(g00i, r0, ni0);
+        ni0 = _mm256_fmadd_pd(g01r, i1, ni0);
+        ni0 = _mm256_fmadd_pd(g01i, r1, ni0);
+
+        __m256d nr1 = _mm256_mul_pd(g10r, r0);
+        nr1 = _mm256_fnmadd_pd(g10i, i0, nr1);
+        nr1 = _mm256_fmadd_pd(g11r, r1, nr1);
+        nr1 = _mm256_fnmadd_pd(g11i, i1, nr1);
+        __m256d ni1 = _mm256_mul_pd(g10r, i0);
+        ni1 = _mm256_fmadd_pd(g10i, r0, ni1);
+        ni1 = _mm256_fmadd_pd(g11r, i1, ni1);
+        ni1 = _mm256_fmadd_pd(g11i, r1, ni1);
+
+        _mm256_storeu_pd(re + i, nr0);
+        _mm256_storeu_pd(im + i, ni0);
+        _mm256_storeu_pd(re + j, nr1);
+        _mm256_storeu_pd(im + j, ni1);
+    }
+}
+#endif
+
+/*
+ * Applies the 2x2 matrix (gr + i*gi, row-major) to qubit `target` on every
+ * basis state whose control bits `cmask` are all set (cmask = 0: always).
+ */
+void apply_1q(double *re, double *im, const double gr[4], const double gi[4],
+              int target, uint64_t cmask, size_t nstates)
+{
+    uint64_t m = 1ULL << target;
+    uint64_t npairs = nstates >> 1;
+
+#ifdef SVKERNEL_X86
+    /* With target >= 2 and no controls on bits 0-1, four consecutive pair
+     * indices share the same control outcome and are contiguous in memory. */
+    if (target >= 2 && (cmask & 3) == 0 && cpu_has_avx2_fma()) {
+        apply_1q_avx2(re, im, gr, gi, target, cmask, npairs);
+        return;
+    }
+#endif
+
+    for (uint64_t k = 0; k < npairs; k++) {
+        uint64_t i = insert_zero(k, target);
+        if ((i & cmask) != cmask)
+            continue;
+        apply_1q_pair(re, im, gr, gi, i, i | m);
+    }
+}
+
+/*
+ * Applies the 4x4 matrix (gr + i*gi, row-major) to qubits (q0, q1); rows and
+ * columns are indexed by bit(q0) + 2 * bit(q1), as in Qiskit.
+ */
+void apply_2q(double *re, double *im, const double gr[16], const double gi[16],
+              int q0, int q1, size_t nstates)
+{
+    int lo = q0 < q1 ? q0 : q1;
+    int hi = q0 < q1 ? q1 : q0;
+    uint64_t b0 = 1ULL << q0, b1 = 1ULL << q1;
+    uint64_t ngroups = nstates >> 2;
+
+    for (uint64_t k = 0; k < ngroups; k++) {
+        uint64_t i = insert_zero(insert_zero(k, lo), hi);
+        uint64_t idx[4] = {i, i | b0, i | b1, i | b0 | b1};
+        double ar[4], ai[4];
+        for (int c = 0; c < 4; c++) {
+            ar[c] = re[idx[c]];
+            ai[c] = im[idx[c]];
+        }
+        for (int r = 0; r < 4; r++) {
+            double sr = 0.0, si = 0.0;
+            for (int c = 0; c < 4; c++) {
+                sr += gr[4 * r + c] * ar[c] - gi[4 * r + c] * ai[c];
+                si += gr[4 * r + c] * ai[c] + gi[4 * r + c] * ar[c];
+            }
+            re[idx[r]] = sr;
+            im[idx[r]] = si;
+        }
+    }
+}
@@ -142,7 +142,11 @@ const SimulationPanel = () => {
           memory: false,
         });
         setServerConnected(true);
-        setResults(response.probabilities);
+        // The backend returns raw counts; probabilities are counts / shots
+        const probabilities = Object.fromEntries(
+          Object.entries(response.counts).map(([state, count]) => [state, count / response.shots])
+        );
+        setResults(probabilities);
         setSimulationComplete(true);
         setActiveTab(1);
       } catch (err) {
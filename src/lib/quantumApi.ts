@@ -29,6 +29,7 @@ export type ExecutePayload = {
   shots?: number;
   memory?: boolean;
   backend?: string;
+  return_probabilities?: boolean;
 };
 
 export async function executeCircuit(payload: ExecutePayload) {
@@ -48,12 +49,94 @@ export async function executeCircuit(payload: ExecutePayload) {
     backend: string;
     shots: number;
     counts: Record<string, number>;
-    probabilities: Record<string, number>;
+    probabilities?: Record<string, number> | null;
     memory?: string[] | null;
     status: string;
   }>;
 }
 
+export type BinaryEvolution = {
+  numQubits: number;
+  // One interleaved [re0, im0, re1, im1, ...] array per snapshot
+  states: Float32Array[];
+};
+
+export async function executeEvolutionBinary(payload: ExecutePayload): Promise<BinaryEvolution> {
+  const base = getApiBaseUrl();
+  if (!base) throw new Error("API base URL is not configured (VITE_API_BASE_URL)");
+
+  const res = await fetch(`${base}/api/v1/execute-evolution-binary`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  });
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(`Backend error ${res.status}: ${text}`);
+  }
+
+  // Layout: uint32 num_qubits, uint32 num_states, then complex64 amplitudes (little-endian)
+  const buffer = await res.arrayBuffer();
+  const header = new DataView(buffer, 0, 8);
+  const numQubits = header.getUint32(0, true);
+  const numStates = header.getUint32(4, true);
+  const stride = 2 * 2 ** numQubits;
+  const states: Float32Array[] = [];
+  for (let i = 0; i < numStates; i++) {
+    states.push(new Float32Array(buffer, 8 + i * stride * 4, stride));
+  }
+  return { numQubits, states };
+}
+
+export type EvolutionLine =
+  | { col: number; state: string[] }
+  | { status: "error"; detail: string };
+
+// Streams /execute-evolution-stream, calling onState for each snapshot as it arrives.
+// Resolves with the number of snapshots received.
+export async function executeEvolutionStream(
+  payload: ExecutePayload,
+  onState: (col: number, state: string[]) => void,
+  signal?: AbortSignal,
+): Promise<number> {
+  const base = getApiBaseUrl();
+  if (!base) throw new Error("API base URL is not configured (VITE_API_BASE_URL)");
+
+  const res = await fetch(`${base}/api/v1/execute-evolution-stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+    signal,
+  });
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    throw new Error(`Backend error ${res.status}: ${text}`);
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffered = "";
+  let received = 0;
+  const handle = (raw: string) => {
+    if (!raw) return;
+    const line = JSON.parse(raw) as EvolutionLine;
+    if ("status" in line) throw new Error(`Backend error: ${line.detail}`);
+    onState(line.col, line.state);
+    received++;
+  };
+
+  // One JSON object per line; a chunk may end mid-line
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += value;
+    const lines = buffered.split("\n");
+    buffered = lines.pop() ?? "";
+    lines.forEach(handle);
+  }
+  handle(buffered);
+  return received;
+}
+
 export async function checkHealth(): Promise<boolean> {
   const base = getApiBaseUrl();
   if (!base) return false;